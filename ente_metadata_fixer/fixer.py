@@ -0,0 +1,713 @@
+"""Module for updating metadata of images and videos exported from Ente."""
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import contextlib
+import datetime
+import functools
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import signal
+import struct
+import subprocess
+import sys
+import time
+import types
+from typing import TYPE_CHECKING
+
+# Check for piexif dependency
+try:
+    import piexif
+except ImportError:
+    print("Error: 'piexif' library is not installed.")
+    print("Please install it using: pip install piexif")
+    sys.exit(1)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+# orjson is optional; it parses the sidecars considerably faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pyexiftool is optional; with it, QuickTime videos that cannot be patched in
+# place go through a long-running exiftool process instead of ffmpeg
+try:
+    import exiftool
+except ImportError:
+    exiftool = None
+
+# ciso8601 is optional; its C parser is much faster than fromisoformat
+try:
+    from ciso8601 import parse_datetime as ciso8601_parse_datetime
+except ImportError:
+    ciso8601_parse_datetime = None
+
+# Containers whose dates can be written without remuxing
+QUICKTIME_EXTS = {".mp4", ".mov", ".m4v"}
+
+# Per worker process state; exiftool_helper is set by _init_video_worker
+# when exiftool is usable
+_video_worker = types.SimpleNamespace(exiftool_helper=None)
+
+# QuickTime/MP4 times count seconds from 1904-01-01 UTC
+QUICKTIME_EPOCH_OFFSET = 2082844800
+
+# Boxes holding a creation_time field, and the boxes that lead to them
+_QUICKTIME_TIME_BOXES = {b"mvhd", b"tkhd", b"mdhd"}
+_QUICKTIME_CONTAINER_BOXES = {b"moov", b"trak", b"mdia"}
+
+
+def load_metadata(json_path):
+    """Read and parse a JSON metadata file.
+
+    Uses orjson when it is installed, otherwise the standard json module.
+    """
+    if orjson is not None:
+        with open(json_path, "rb") as f:
+            return orjson.loads(f.read())
+
+    with open(json_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _find_sidecar(directory: str, name: str, json_names: dict[str, str]) -> str | None:
+    """Return the path of the metadata file for name, or None.
+
+    json_names maps the JSON file names in directory, and their casefolded
+    forms, to the real names. An exact match wins; otherwise names match
+    regardless of case, like they do on the case-insensitive filesystems
+    macOS and Windows use by default (e.g. IMG_1.JPG and IMG_1.jpg.JSON).
+    """
+    # Strategy 1: file.jpg -> file.jpg.json
+    # Strategy 2: file.jpg -> file.json
+    for candidate in (name + ".json", os.path.splitext(name)[0] + ".json"):
+        json_name = json_names.get(candidate) or json_names.get(candidate.casefold())
+        if json_name is not None:
+            return os.path.join(directory, json_name)
+    return None
+
+
+def _iter_media(directory, handlers):
+    """Lazily yield (entry, handler, json_path) for media files under directory.
+
+    Directories are walked depth-first from an explicit stack with
+    os.scandir, so files are produced as soon as their directory is read
+    and only the pending directories are held in memory. A single pass over
+    each directory sorts its entries into media files and JSON files, which
+    turns finding a file's metadata into dict lookups with no further stat
+    calls. handler is looked up in handlers by the file's lowercased
+    extension, and json_path is None if no metadata file was found.
+    Like os.walk, symlinked directories are not followed.
+    """
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        media = []
+        json_names = {}
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    name = entry.name
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            stack.append(entry.path)
+                    elif name.lower().endswith(".json"):
+                        json_names[name] = name
+                        json_names.setdefault(name.casefold(), name)
+                    else:
+                        handler = handlers.get(os.path.splitext(name)[1].lower())
+                        if handler is not None:
+                            media.append((entry, handler))
+        except OSError:
+            continue
+
+        for entry, handler in media:
+            yield entry, handler, _find_sidecar(current, entry.name, json_names)
+
+
+# Exports often contain many files sharing a timestamp (bursts, scans), so
+# the conversions below are memoized on the raw value from the JSON.
+@functools.lru_cache(maxsize=4096)
+def _parse_iso(value):
+    """Parse an ISO 8601 string such as 2023-01-01T12:00:00Z."""
+    if ciso8601_parse_datetime is not None:
+        # Handles the "Z" suffix natively
+        return ciso8601_parse_datetime(value)
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+@functools.lru_cache(maxsize=4096)
+def _from_epoch(timestamp):
+    """Convert a Unix timestamp (seconds) to a local datetime."""
+    return datetime.datetime.fromtimestamp(timestamp)
+
+
+def _timestamp_to_datetime(timestamp):
+    """Convert a Unix timestamp in seconds or milliseconds to a datetime."""
+    # Check if timestamp is in milliseconds (common in Java/JS) or seconds
+    # If year is > 3000, assume milliseconds
+    if timestamp > 100000000000:
+        timestamp = timestamp / 1000.0
+    return _from_epoch(timestamp)
+
+
+def _fast_parse(json_data):
+    """Handle the usual export shape: {"creationTime": {"timestamp": "..."}}.
+
+    Nearly all sidecars store the first key parse_timestamp looks for as a
+    nested integer string, so that case is checked with a few direct dict
+    lookups. Returns None for anything else, leaving it to the general code.
+    """
+    val = json_data.get("creationTime")
+    if val is None:
+        val = json_data.get("photoTakenTime")
+    if type(val) is dict:
+        timestamp = val.get("timestamp")
+        if type(timestamp) is str and timestamp.isdecimal():
+            timestamp = int(timestamp)
+            if timestamp:
+                return _timestamp_to_datetime(timestamp)
+    return None
+
+
+def parse_timestamp(json_data) -> datetime.datetime | None:
+    """Extract the timestamp from Ente JSON data.
+
+    Returns a datetime object or None.
+    """
+    dt = _fast_parse(json_data)
+    if dt is not None:
+        return dt
+
+    # Common fields in Ente exports or Google Takeout style JSONs
+    possible_keys = ["creationTime", "photoTakenTime", "dateTaken", "timestamp"]
+
+    for key in possible_keys:
+        val = json_data.get(key)
+        if val is None:
+            continue
+
+        # Handle nested objects like {"timestamp": "123456"}
+        if isinstance(val, dict):
+            val = val.get("timestamp", val)
+
+        # Handle string timestamps
+        if isinstance(val, str):
+            try:
+                # Try parsing integer string
+                val = int(val)
+            except ValueError:
+                # Try parsing ISO string (simplified)
+                try:
+                    # 2023-01-01T12:00:00Z
+                    return _parse_iso(val)
+                except ValueError:
+                    continue
+
+        if isinstance(val, (int, float)) and val:
+            return _timestamp_to_datetime(val)
+
+    return None
+
+
+def _may_have_exif(image_data) -> bool:
+    """Cheaply check whether an image could already carry EXIF data.
+
+    Only JPEGs are inspected: their APP1 "Exif" segment sits in the header,
+    so if the marker is not in the first 64KB there is nothing to load.
+    Other formats are always handed to piexif.
+    """
+    if not image_data.startswith(b"\xff\xd8"):
+        return True
+    return image_data.find(b"Exif\x00\x00", 0, 64 * 1024) != -1
+
+
+def _empty_exif():
+    """Return an EXIF dict with no tags, as piexif.load gives for bare files."""
+    return {"0th": {}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None}
+
+
+# Memoized per date, for the same reason as _parse_iso
+@functools.lru_cache(maxsize=1024)
+def _exif_date(dt):
+    """Encode a datetime in the EXIF format: "YYYY:MM:DD HH:MM:SS"."""
+    return dt.strftime("%Y:%m:%d %H:%M:%S").encode("utf-8")
+
+
+def _set_exif_dates(exif_dict, dt):
+    """Set the original, digitized and modified dates in an EXIF dict."""
+    exif_date = _exif_date(dt)
+    exif_dict["Exif"][piexif.ExifIFD.DateTimeOriginal] = exif_date
+    exif_dict["Exif"][piexif.ExifIFD.DateTimeDigitized] = exif_date
+    exif_dict["0th"][piexif.ImageIFD.DateTime] = exif_date
+
+
+@functools.lru_cache(maxsize=1024)
+def _date_only_exif_bytes(dt):
+    """Dump an EXIF block that carries nothing but the dates."""
+    exif_dict = _empty_exif()
+    _set_exif_dates(exif_dict, dt)
+    return piexif.dump(exif_dict)
+
+
+def update_image_exif(file_path, dt):
+    """Updates the EXIF DateTimeOriginal field for images using piexif.
+
+    Returns "updated", "skipped_unchanged" if the dates were already set,
+    or "failed".
+    """
+    try:
+        # Only the wall-clock time is written. Aware datetimes for the same
+        # instant compare equal but format differently, so drop the zone
+        # before the value is used as a cache key.
+        if dt.tzinfo is not None:
+            dt = dt.replace(tzinfo=None)
+
+        # Read the image once; piexif loads from and inserts into the bytes
+        with open(file_path, "rb") as f:
+            image_data = f.read()
+
+        # piexif can only insert into JPEG and WebP. Check here, as it would
+        # otherwise take other bytes for a file name.
+        if not (
+            image_data.startswith(b"\xff\xd8")
+            or (image_data[:4] == b"RIFF" and image_data[8:12] == b"WEBP")
+        ):
+            print(f"Failed to update image {file_path}: neither JPEG nor WEBP")
+            return "failed"
+
+        exif_dict = None
+        if _may_have_exif(image_data):
+            try:
+                exif_dict = piexif.load(image_data)
+            except Exception:
+                # Unreadable EXIF is replaced like missing EXIF
+                exif_dict = None
+
+        if exif_dict is None:
+            # If no EXIF data exists, the result only depends on the date
+            exif_bytes = _date_only_exif_bytes(dt)
+        else:
+            # Leave files from an earlier run alone if they already match
+            exif_date = _exif_date(dt)
+            if (
+                exif_dict["Exif"].get(piexif.ExifIFD.DateTimeOriginal) == exif_date
+                and exif_dict["Exif"].get(piexif.ExifIFD.DateTimeDigitized) == exif_date
+                and exif_dict["0th"].get(piexif.ImageIFD.DateTime) == exif_date
+            ):
+                return "skipped_unchanged"
+
+            _set_exif_dates(exif_dict, dt)
+            exif_bytes = piexif.dump(exif_dict)
+
+        piexif.insert(exif_bytes, image_data, file_path)
+        return "updated"
+    except Exception as e:
+        print(f"Failed to update image {file_path}: {e}")
+        return "failed"
+
+
+def _iter_boxes(f, start, end):
+    """Yield (type, payload_start, box_end) for the ISO-BMFF boxes in a range."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        header_size = 8
+        if size == 1:
+            # 64-bit size follows the type
+            if pos + 16 > end:
+                return
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            # Box extends to the end of the enclosing range
+            size = end - pos
+        if size < header_size or pos + size > end:
+            return
+        yield box_type, pos + header_size, pos + size
+        pos += size
+
+
+def _find_quicktime_time_fields(f, start, end):
+    """Collect (box_type, offset, version) for every creation_time field."""
+    fields = []
+    for box_type, payload, box_end in _iter_boxes(f, start, end):
+        if box_type in _QUICKTIME_CONTAINER_BOXES:
+            fields.extend(_find_quicktime_time_fields(f, payload, box_end))
+        elif box_type in _QUICKTIME_TIME_BOXES and box_end - payload > 12:
+            # Full box: version (1 byte) and flags (3) precede creation_time
+            f.seek(payload)
+            fields.append((box_type, payload + 4, f.read(1)[0]))
+    return fields
+
+
+def patch_quicktime_dates(file_path, dt) -> str | None:
+    """Overwrite the mvhd/tkhd/mdhd creation times of an MP4/MOV in place.
+
+    Only the few bytes holding the timestamps are written, instead of
+    remuxing the whole file. Returns "updated", or "skipped_unchanged" if
+    every field already holds the date. Returns None, leaving the file
+    untouched, if the layout is not understood or the date does not fit.
+    """
+    seconds = int(dt.timestamp()) + QUICKTIME_EPOCH_OFFSET
+    with open(file_path, "r+b") as f:
+        end = f.seek(0, os.SEEK_END)
+        fields = _find_quicktime_time_fields(f, 0, end)
+
+        if not any(box_type == b"mvhd" for box_type, _, _ in fields):
+            return None
+        if seconds < 0 or any(
+            version == 0 and seconds > 0xFFFFFFFF for _, _, version in fields
+        ):
+            return None
+
+        packed = []
+        for _, offset, version in fields:
+            value = struct.pack(">Q" if version == 1 else ">I", seconds)
+            f.seek(offset)
+            if f.read(len(value)) != value:
+                packed.append((offset, value))
+        if not packed:
+            return "skipped_unchanged"
+
+        for offset, value in packed:
+            f.seek(offset)
+            f.write(value)
+        f.flush()
+        os.fsync(f.fileno())
+    return "updated"
+
+
+def update_video_metadata(file_path, dt):
+    """Updates the creation_time metadata for videos.
+
+    QuickTime containers are patched in place; if that is not possible they
+    go through the worker's exiftool process when one is available.
+    Everything else is remuxed with ffmpeg.
+
+    Returns "updated", "skipped_unchanged" if a QuickTime file already had
+    the date, or "failed".
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in QUICKTIME_EXTS:
+        try:
+            outcome = patch_quicktime_dates(file_path, dt)
+        except Exception as e:
+            print(f"Failed to update video {file_path}: {e}")
+            return "failed"
+        if outcome is not None:
+            return outcome
+        if _video_worker.exiftool_helper is not None:
+            return _update_video_exiftool(file_path, dt)
+    return _update_video_ffmpeg(file_path, dt)
+
+
+def _update_video_exiftool(file_path, dt):
+    """Writes the QuickTime creation dates in place using exiftool."""
+    try:
+        # Format for exiftool: "YYYY:MM:DD HH:MM:SS", converted to UTC on write
+        # like ffmpeg does for creation_time
+        date_str = dt.strftime("%Y:%m:%d %H:%M:%S")
+        _video_worker.exiftool_helper.set_tags(
+            [file_path],
+            tags={
+                "QuickTime:CreateDate": date_str,
+                "QuickTime:TrackCreateDate": date_str,
+                "QuickTime:MediaCreateDate": date_str,
+            },
+            params=["-overwrite_original", "-P", "-api", "QuickTimeUTC=1"],
+        )
+        return "updated"
+    except Exception as e:
+        print(f"Failed to update video {file_path}: {e}")
+        return "failed"
+
+
+def _update_video_ffmpeg(file_path, dt):
+    """Updates the creation_time metadata for videos using ffmpeg."""
+    try:
+        # Format for FFmpeg: "YYYY-MM-DD HH:MM:SS"
+        date_str = dt.strftime("%Y-%m-%d %H:%M:%S")
+
+        temp_file = file_path + ".temp" + os.path.splitext(file_path)[1]
+
+        # ffmpeg command to copy stream and update metadata
+        cmd = [
+            "ffmpeg",
+            "-y",  # Overwrite output
+            "-i",
+            file_path,
+            "-c",
+            "copy",
+            "-metadata",
+            f"creation_time={date_str}",
+            "-map_metadata",
+            "0",  # Copy global metadata
+            temp_file,
+        ]
+
+        # Run ffmpeg quietly
+        result = subprocess.run(
+            cmd,
+            check=False,
+            capture_output=True,
+        )
+
+        if result.returncode == 0:
+            # Replace original file with temp file
+            os.replace(temp_file, file_path)
+            return "updated"
+        print(f"FFmpeg failed for {file_path}: {result.stderr.decode()}")
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        return "failed"
+
+    except Exception as e:
+        print(f"Failed to update video {file_path}: {e}")
+        return "failed"
+
+
+def _init_video_worker():
+    """Pool initializer: give this worker its own exiftool process.
+
+    exiftool runs in -stay_open mode and is started on first use, so its
+    startup cost is paid once per worker rather than once per video.
+    Ctrl-C is left to the main process, which cancels the queued jobs, so
+    that workers do not each die mid-file with their own traceback.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if exiftool is None:
+        return
+    try:
+        _video_worker.exiftool_helper = exiftool.ExifToolHelper()
+    except FileNotFoundError:
+        # pyexiftool is installed but the exiftool executable is not
+        return
+    multiprocessing.util.Finalize(
+        None, _video_worker.exiftool_helper.terminate, exitpriority=10,
+    )
+
+
+# Supported extensions and the function that updates files of each kind.
+# PNG often doesn't support standard EXIF in same way or piexif issues.
+MEDIA_HANDLERS = {
+    ".jpg": update_image_exif,
+    ".jpeg": update_image_exif,
+    ".tiff": update_image_exif,
+    ".webp": update_image_exif,
+    ".mp4": update_video_metadata,
+    ".mov": update_video_metadata,
+    ".m4v": update_video_metadata,
+    ".avi": update_video_metadata,
+    ".mkv": update_video_metadata,
+}
+
+
+def _process_file(update, file_path, json_path):
+    """Pool entry point: read a file's metadata and apply update to it.
+
+    Runs in the pools so that reading and parsing the JSON files happens
+    concurrently too. Returns (file_path, outcome, reason), where outcome
+    is "skipped_no_timestamp" or whatever update returned.
+    """
+    try:
+        dt = parse_timestamp(load_metadata(json_path))
+    except Exception as e:
+        print(f"Error processing {os.path.basename(file_path)}: {e}")
+        return file_path, "failed", str(e)
+
+    if not dt:
+        # print(f"No valid timestamp found in JSON for: {file_path}")
+        return file_path, "skipped_no_timestamp", None
+    outcome = update(file_path, dt)
+    if outcome == "failed":
+        return file_path, outcome, "Update failed (check logs)"
+    return file_path, outcome, None
+
+
+def _collect(
+    pending: dict,
+    outcomes: collections.Counter,
+    failed_files: list,
+    timeout: float | None = None,
+    return_when: str = concurrent.futures.ALL_COMPLETED,
+) -> None:
+    """Wait for pending jobs and tally the ones that finished.
+
+    pending maps each future to its file path; finished futures are removed
+    from it, and failed files are recorded. timeout and return_when are
+    passed on to concurrent.futures.wait.
+    """
+    done, _ = concurrent.futures.wait(
+        pending,
+        timeout=timeout,
+        return_when=return_when,
+    )
+    for future in done:
+        file_path = pending.pop(future)
+        try:
+            _, outcome, reason = future.result()
+        except Exception as e:
+            # The job never reported back, e.g. its worker process died and
+            # took the pool down with it
+            outcome, reason = "failed", str(e) or type(e).__name__
+        outcomes[outcome] += 1
+        if reason is not None:
+            failed_files.append((file_path, reason))
+
+
+def _print_progress(
+    processed: int,
+    outcomes: collections.Counter,
+    in_progress: int,
+) -> None:
+    """Print a one-line account of how far processing has got."""
+    print(
+        f"Scanned {processed} files: {sum(outcomes.values())} done "
+        f"({outcomes['updated']} updated, {outcomes['failed']} failed), "
+        f"{in_progress} in progress...",
+    )
+
+
+def _print_summary(stats: dict, failed_files: list) -> None:
+    """Print the final counts and the list of files that failed."""
+    print("\n" + "=" * 40)
+    print("PROCESSING SUMMARY")
+    print("=" * 40)
+    print(f"Total files scanned: {stats['processed']}")
+    print(f"Successfully updated: {stats['updated']}")
+    print(f"Failed: {stats['failed']}")
+    print(f"Skipped (no JSON found): {stats['skipped_no_json']}")
+    print(f"Skipped (no timestamp in JSON): {stats['skipped_no_timestamp']}")
+    print(f"Skipped (already up to date): {stats['skipped_unchanged']}")
+
+    if failed_files:
+        print("\n" + "=" * 40)
+        print("FAILED FILES LIST")
+        print("=" * 40)
+        for fpath, reason in failed_files:
+            print(f"[FAILED] {os.path.basename(fpath)}")
+            print(f"  Path: {fpath}")
+            print(f"  Reason: {reason}")
+            print("-" * 20)
+    print("\nDone.")
+
+
+@contextlib.contextmanager
+def _cancel_queued_on_error(
+    executors: Iterable[concurrent.futures.Executor],
+) -> Iterator[None]:
+    """Cancel the jobs still queued on executors if the block is left early.
+
+    Without this, an interrupt (e.g. Ctrl-C) or crash would have the pools
+    shut down only after running every queued job, rewriting up to a full
+    window of files first. Jobs already running still finish their file.
+    Each shutdown waits, as a process pool cancels its queue from a
+    background thread and a later shutdown() call would undo the request.
+    """
+    try:
+        yield
+    except BaseException:
+        print("\nStopping, cancelling queued files...")
+        for executor in executors:
+            executor.shutdown(cancel_futures=True)
+        raise
+
+
+def process_directory(directory):
+    print(f"Scanning directory: {directory}")
+
+    processed = skipped_no_json = 0
+    outcomes = collections.Counter()
+    failed_files = []
+
+    # Jobs are handed to the pools while the walk is still running, with at
+    # most this many in flight so memory does not grow with the tree size
+    max_pending = 1024
+    pending = {}
+
+    # Progress is printed at most once per interval rather than per file
+    progress_interval = 1.0
+    next_progress = time.monotonic() + progress_interval
+
+    # Bind lookups used for every file to locals once, outside the loops
+    _monotonic = time.monotonic
+
+    # Every file is read and updated independently. Videos are spread over a
+    # pool of worker processes, and images over a pool of threads since the
+    # work for them is mostly file I/O, which releases the GIL. Video workers
+    # are spawned rather than forked, as they start on demand and may do so
+    # while image threads are running.
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_video_worker,
+    ) as video_executor, concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(32, (os.cpu_count() or 1) * 4),
+    ) as image_executor:
+        executors = {
+            update_image_exif: image_executor,
+            update_video_metadata: video_executor,
+        }
+
+        with _cancel_queued_on_error(executors.values()):
+            for entry, handler, json_path in _iter_media(directory, MEDIA_HANDLERS):
+                processed += 1
+
+                if json_path:
+                    try:
+                        future = executors[handler].submit(
+                            _process_file, handler, entry.path, json_path,
+                        )
+                    except concurrent.futures.BrokenExecutor as e:
+                        # A worker died earlier; keep going with the other pool
+                        outcomes["failed"] += 1
+                        failed_files.append((entry.path, str(e)))
+                    else:
+                        pending[future] = entry.path
+                else:
+                    skipped_no_json += 1
+                    # print(f"No JSON found for: {entry.name}")
+
+                if len(pending) >= max_pending:
+                    _collect(
+                        pending,
+                        outcomes,
+                        failed_files,
+                        return_when=concurrent.futures.FIRST_COMPLETED,
+                    )
+
+                now = _monotonic()
+                if now >= next_progress:
+                    # Tally whatever has finished so the counts are current
+                    _collect(pending, outcomes, failed_files, timeout=0)
+                    _print_progress(processed, outcomes, len(pending))
+                    next_progress = now + progress_interval
+
+            # The walk is done; keep reporting while the remaining jobs finish
+            while pending:
+                _collect(pending, outcomes, failed_files, timeout=progress_interval)
+                now = _monotonic()
+                if pending and now >= next_progress:
+                    _print_progress(processed, outcomes, len(pending))
+                    next_progress = now + progress_interval
+
+    stats = {
+        "processed": processed,
+        "updated": outcomes["updated"],
+        "failed": len(failed_files),
+        "skipped_no_json": skipped_no_json,
+        "skipped_no_timestamp": outcomes["skipped_no_timestamp"],
+        "skipped_unchanged": outcomes["skipped_unchanged"],
+    }
+
+    _print_summary(stats, failed_files)
+